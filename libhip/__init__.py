@@ -1 +1,15 @@
-from .hip import HIPImage
+__all__ = ["HIPImage"]
+
+
+def __getattr__(name):
+    # Import the HIP module lazily so `python -m libhip` does not pull in Pillow/NumPy before it needs them.
+    if name == "HIPImage":
+        from .hip import HIPImage
+        return HIPImage
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    # List the lazy attributes alongside the module globals so the public API still shows up in `dir()`.
+    return sorted(set(globals()) | set(__all__))
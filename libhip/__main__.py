@@ -1,50 +1,66 @@
 import os
 import argparse
 
-from .hip import HIPImage
+# Favour encode speed over file size when converting from the command line.
+CLI_PNG_COMPRESS_LEVEL = 1
 
 
 def hip_to_png(hip_path):
+    from .hip import HIPImage
+
     image = HIPImage()
     image.load_hip(hip_path)
-    image.save_png(hip_path.replace(".hip", ".png"))
+    image.save_png(hip_path.replace(".hip", ".png"), compress_level=CLI_PNG_COMPRESS_LEVEL)
 
 
 def png_to_hip(png_path):
+    from .hip import HIPImage
+
     image = HIPImage()
     image.load_png(png_path)
     image.save_hip(png_path.replace(".png", ".hip"))
 
 
+def convert_all(convert, paths):
+    """
+    Run the given conversion over every input path.
+    Each conversion is independent and CPU bound so multiple inputs are spread over a process pool.
+    """
+    if len(paths) == 1:
+        convert(paths[0])
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor() as executor:
+        # Consume the results so any exception raised by a conversion is propagated.
+        list(executor.map(convert, paths))
+
+
 def abs_path(value):
     value = os.path.abspath(value)
 
     if not os.path.exists(value):
-        raise argparse.ArgumentError("Invalid file path! Does not exist!")
+        raise argparse.ArgumentTypeError("Invalid file path! Does not exist!")
 
     return value
 
 
 def main():
     parser = argparse.ArgumentParser("hip")
-    subparsers = parser.add_subparsers(title="commands")
+    subparsers = parser.add_subparsers(title="commands", dest="command")
+    subparsers.required = True
 
     topng = subparsers.add_parser("topng")
-    topng.add_argument(dest="hip_path", type=abs_path, help="HIP file input path.")
-
-    topng = subparsers.add_parser("frompng")
-    topng.add_argument(dest="png_path", type=abs_path, help="PNG file input path.")
-
-    args, _ = parser.parse_known_args()
-
-    hip_path = getattr(args, "hip_path", None)
-    png_path = getattr(args, "png_path", None)
+    topng.add_argument(dest="hip_path", nargs="+", type=abs_path, help="HIP file input path(s).")
+    topng.set_defaults(func=lambda args: convert_all(hip_to_png, args.hip_path))
 
-    if hip_path is not None:
-        hip_to_png(hip_path)
+    frompng = subparsers.add_parser("frompng")
+    frompng.add_argument(dest="png_path", nargs="+", type=abs_path, help="PNG file input path(s).")
+    frompng.set_defaults(func=lambda args: convert_all(png_to_hip, args.png_path))
 
-    if png_path is not None:
-        png_to_hip(png_path)
+    args = parser.parse_args()
+    args.func(args)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,10 @@
 import io
 import os
+import mmap
 import struct
 import contextlib
 
+import numpy as np
 from PIL import Image
 
 HIP_PREFIX = b"HIP\x00"
@@ -14,27 +16,32 @@ RAW_A_SIZE = 1
 RAW_RGB_SIZE = 3
 BITS_PER_COLOR_CHANNEL = 8
 
+# Pillow uses the zlib default compression level for PNG images when one is not given.
+PNG_DEFAULT_COMPRESS_LEVEL = -1
+# Buffer size used when reading PNG images from a file path.
+PNG_READ_BUFFER_SIZE = 1 << 16
+
 HIP_MAX_COLORS = 256
 MAX_BYTE_VALUE = 255
 
 HIP_PAL_IMG_CHUNK_SIZE = 2
 HIP_RAW_IMG_CHUNK_SIZE = 5
 
-HIP_FILE_SIZE_INDEX = 1
-HIP_NUM_COLORS_INDEX = 2
-
-HIP_PAL_IMG_WIDTH_INDEX = 0
-HIP_PAL_IMG_HEIGHT_INDEX = 1
-HIP_PAL_X_OFFSET_INDEX = 2
-HIP_PAL_Y_OFFSET_INDEX = 3
+# Channel order that converts a 4 byte color between BGRA and RGBA, the swap works in either direction.
+BGRA_RGBA_SWIZZLE = [2, 1, 0, 3]
 
-HIP_RAW_IMG_WIDTH_INDEX = 3
-HIP_RAW_IMG_HEIGHT_INDEX = 4
+# Pre-compiled structs for the fixed HIP header layouts so we are not re-parsing format strings on every read.
+# Only the fields we use are unpacked, the rest are skipped as pad bytes.
+# Header: unknown, file size, number of colors, width, height, 8 unknown bytes.
+# For palette images the width and height describe the coordinate space rather than the image.
+HEADER_STRUCT = struct.Struct("<4xIIII8x")
+# Palette header: image width, image height, x offset, y offset, 4 unknown ints.
+PALETTE_HEADER_STRUCT = struct.Struct("<IIII16x")
 
-INT_SIZE = struct.calcsize("<I")
-
-HEADER_SIZE = INT_SIZE * 7
-PALETTE_HEADER_SIZE = INT_SIZE * 8
+# When writing a HIP file we pack the prefix and every field of the headers in one go.
+# Palette images follow the main header with the palette image sub-header.
+RAW_FILE_HEADER_STRUCT = struct.Struct("<4sIIIIIII")
+PALETTE_FILE_HEADER_STRUCT = struct.Struct("<4sIIIIIIIIIIIIIII")
 
 # TODO: we probably want to support:
 #       24 bit color (i.e. RGB with no transparency)
@@ -44,29 +51,33 @@ PALETTE_HEADER_SIZE = INT_SIZE * 8
 @contextlib.contextmanager
 def output_image(hip_output):
     """
-    Helper context manager that either wraps `open()` or simply yields an `io.BytesIO`.
+    Helper context manager that either wraps `open()` or simply yields a writable file object.
     Also provides basic type validation.
     """
     if isinstance(hip_output, str):
         with open(hip_output, "wb") as hpl_fp:
             yield hpl_fp
 
-    elif isinstance(hip_output, io.BytesIO):
+    # Accept any binary file object, i.e. `io.BytesIO` or an already opened or buffered file.
+    elif hasattr(hip_output, "write"):
         yield hip_output
 
     else:
         raise TypeError(f"Unsupported output image type {hip_output}!")
 
 
-def _unpack_from(fmt, data):
+@contextlib.contextmanager
+def input_png(png_input):
     """
-    Helper function to call and return the result of struct.unpack_from
-    as well as any remaining packed data that exists in our bytestring following what was unpacked.
+    Helper context manager for PNG inputs that either wraps `open()` or simply yields the given file object.
+    Files are opened with a 64 KiB read buffer rather than the default 8 KiB so Pillow needs fewer read calls.
     """
-    offset = struct.calcsize(fmt)
-    unpacked = struct.unpack_from(fmt, data)
-    remaining = data[offset:]
-    return unpacked, remaining
+    if isinstance(png_input, str):
+        with open(png_input, "rb", buffering=PNG_READ_BUFFER_SIZE) as png_fp:
+            yield png_fp
+
+    else:
+        yield png_input
 
 
 def _parse_header(hip_contents):
@@ -77,175 +88,144 @@ def _parse_header(hip_contents):
     Additional reference:
     https://github.com/Labreezy/bb-collision-editor/blob/master/BBCollisionEditor/OverlaidImage.cs
     """
-    if not hip_contents.startswith(HIP_PREFIX):
+    if hip_contents[:len(HIP_PREFIX)] != HIP_PREFIX:
         raise ValueError("Not valid HIP file! Missing HIP file header prefix!")
 
-    remaining = hip_contents[len(HIP_PREFIX):]
-    header, remaining = _unpack_from("<IIIIIbbbbbbbb", remaining)
+    offset = len(HIP_PREFIX)
+    hip_file_size, num_colors, raw_width, raw_height = HEADER_STRUCT.unpack_from(hip_contents, offset)
+    offset += HEADER_STRUCT.size
 
-    hip_file_size = header[HIP_FILE_SIZE_INDEX]
     if hip_file_size != len(hip_contents):
         raise ValueError("Not valid HIP file! File size mismatch!")
 
-    # Grab important info our of the header.
-    # Note that not all of it is currently used in this script but we grab it anyway.
-    num_colors = header[HIP_NUM_COLORS_INDEX]
-
     # If a number of colors is called out then this HIP file represents a palette image.
     # The pixel data described in this file are palette indices.
     if num_colors:
         if num_colors < HIP_MAX_COLORS:
             raise ValueError(f"Image contains {num_colors} colors which is less than {HIP_MAX_COLORS}!")
 
-        palette_header, remaining = _unpack_from("<IIIIIIII", remaining)
+        width, height, x_offset, y_offset = PALETTE_HEADER_STRUCT.unpack_from(hip_contents, offset)
+        offset += PALETTE_HEADER_STRUCT.size
 
-        coord_width = header[HIP_RAW_IMG_WIDTH_INDEX]
-        coord_height = header[HIP_RAW_IMG_HEIGHT_INDEX]
-        width = palette_header[HIP_PAL_IMG_WIDTH_INDEX]
-        height = palette_header[HIP_PAL_IMG_HEIGHT_INDEX]
-        x_offset = palette_header[HIP_PAL_X_OFFSET_INDEX]
-        y_offset = palette_header[HIP_PAL_Y_OFFSET_INDEX]
+        # Palette images store the size of the coordinate space in the main header.
+        coord_width = raw_width
+        coord_height = raw_height
 
     # Otherwise this HIP file describes raw RGBA pixel data and we have no palette.
     else:
         coord_width = 0
         coord_height = 0
-        width = header[HIP_RAW_IMG_WIDTH_INDEX]
-        height = header[HIP_RAW_IMG_HEIGHT_INDEX]
+        width = raw_width
+        height = raw_height
         x_offset = 0
         y_offset = 0
 
     # TODO: we need to retain the unused parts of the header so we can write them back out later if need be.
-    return num_colors, (width, height), (coord_width, coord_height), (x_offset, y_offset), remaining
+    return num_colors, (width, height), (coord_width, coord_height), (x_offset, y_offset), offset
 
 
-def _parse_palette(num_colors, hip_contents):
+def _parse_palette(num_colors, hip_contents, offset):
     """
     Parse the palette data from the HIP file and create a raw palette that Pillow can work with.
     Separate the RGB and Alpha channels as we cannot create a palette image with an alpha channel
     in the palette data. The transparency information needs to be included in a tRNS header.
     """
     palette_size = num_colors * (RAW_RGB_SIZE + RAW_A_SIZE)
+    palette = hip_contents[offset:offset+palette_size]
 
-    palette_data = bytearray()
-    alpha_data = bytearray()
-
-    palette_index = 0
-    palette = hip_contents[:palette_size]
-
-    while True:
-        palette_offset = palette_index * (RAW_RGB_SIZE + RAW_A_SIZE)
-
-        bgr = palette[palette_offset:palette_offset+RAW_RGB_SIZE]
-        a = palette[palette_offset+RAW_RGB_SIZE:palette_offset+RAW_RGB_SIZE+RAW_A_SIZE]
-
-        # If there is no remaining palette data from the source then we are done.
-        if not bgr and not a:
-            break
-
-        # Check to ensure we have not de-synced during the parse process.
-        if bool(bgr) != bool(a):
-            raise ValueError("Mismatch between RGB and transparency data!")
-
-        palette_data += bgr
-        alpha_data += a
-
-        palette_index += 1
+    # A truncated file would otherwise leave us with a partial palette.
+    if len(palette) != palette_size:
+        raise ValueError("Palette data length mismatch!")
 
-    if len(palette_data) != len(alpha_data) * (RAW_RGB_SIZE / RAW_A_SIZE):
-        raise ValueError("Mismatch between RGB and transparency data!")
+    # Each palette entry is stored as BGRA, so split the RGB and Alpha channels with strided views.
+    # Transpose the palette data so it works with PNG palette images. Reversing the entries and the
+    # BGR channels is just another strided view, so each channel is copied out exactly once.
+    palette = np.frombuffer(palette, dtype=np.uint8).reshape(num_colors, RAW_RGB_SIZE + RAW_A_SIZE)
+    palette_data = palette[::-1, RAW_RGB_SIZE-1::-1]
+    alpha_data = palette[::-1, RAW_RGB_SIZE]
 
-    # Transpose the palette data so it works with PNG palette images.
-    return palette_data[::-1], alpha_data[::-1], hip_contents[palette_size:]
+    return bytearray(palette_data), bytearray(alpha_data), offset + palette_size
 
 
-def _parse_palette_image_data(img_size, num_colors, hip_contents):
+def _parse_palette_image_data(img_size, num_colors, hip_contents, offset):
     """
     Parse the palette image data of our HIP file.
     """
     width, height = img_size
     total_pixels = width * height
-    chunk_index = 0
 
-    # The Pillow Image.putdata() method expects an iterable of pixel values.
-    # Seemingly this can be any type of iterable of byte values, but we choose to construct a bytearray
-    # featuring the data extracted from the HIP file as a bytearray is memory efficient.
-    data = bytearray()
+    # Our color data is stored in 2 byte chunks.
+    # The data contains the color and number of pixels to render which are that color.
+    if (len(hip_contents) - offset) % HIP_PAL_IMG_CHUNK_SIZE:
+        raise ValueError("Image data length mismatch!")
 
-    while True:
-        chunk_offset = chunk_index * HIP_PAL_IMG_CHUNK_SIZE
+    chunks = np.frombuffer(hip_contents, dtype=np.uint8, offset=offset).reshape(-1, HIP_PAL_IMG_CHUNK_SIZE)
 
-        # Read our color data in 2 byte chunks.
-        # The data contains the color and number of pixels to render which are that color.
-        color_data = hip_contents[chunk_offset:chunk_offset+HIP_PAL_IMG_CHUNK_SIZE]
+    # Color palette index of each chunk.
+    # We subtract our "palette index" from the number of colors as we transposed the palette
+    # as it exists in the HIP file so it is compatible with HPL files.
+    # We need to subtract 1 from the index as a palette index ranges from 0 to num_colors-1.
+    # Do the arithmetic at a wider type so a palette index which does not fit into a byte is caught below
+    # rather than silently wrapping around.
+    palette_indices = num_colors - 1 - chunks[:, 0].astype(np.int64)
 
-        # If the color data chunk is empty then we have parsed the full image.
-        if not color_data:
-            break
+    if palette_indices.size and palette_indices.max() > MAX_BYTE_VALUE:
+        raise ValueError("Palette index out of range!")
 
-        assert len(color_data) == HIP_PAL_IMG_CHUNK_SIZE
+    palette_indices = palette_indices.astype(np.uint8)
 
-        # Color palette index we are currently working with.
-        # We subtract our "palette index" from the number of colors as we transposed the palette
-        # as it exists in the HIP file so it is compatible with HPL files.
-        # We need to subtract 1 from the index as a palette index ranges from 0 to num_colors-1.
-        palette_index = num_colors - color_data[0] - 1
-        # The number of pixels to draw using the given color.
-        num_pixels = color_data[1]
+    # The number of pixels to draw using the color of each chunk.
+    num_pixels = chunks[:, 1]
 
-        # Create  bytearray of length `num_pixels` where each element is the value `palette_index` and
-        # append it to our total image data bytearray.
-        data += bytearray((palette_index,) * num_pixels)
+    # Validate the decoded size before expanding so a corrupt stream never allocates an oversized buffer.
+    if num_pixels.sum(dtype=np.int64) != total_pixels:
+        raise ValueError("Image data length mismatch!")
 
-        chunk_index += 1
+    # If every chunk describes a single pixel the palette indices already are the image data.
+    if np.all(num_pixels == 1):
+        data = palette_indices
 
-    if len(data) != total_pixels:
-        raise ValueError("Image data length mismatch!")
+    # Otherwise expand every chunk into `num_pixels` copies of its palette index in a single pass
+    # rather than building up the image data one chunk at a time.
+    else:
+        data = np.repeat(palette_indices, num_pixels)
 
-    return data
+    return bytearray(data)
 
 
-def _parse_raw_image_data(img_size, hip_contents):
+def _parse_raw_image_data(img_size, hip_contents, offset):
     """
     Parse the raw RGBA image data from our HIP file.
     """
     width, height = img_size
     total_pixels = width * height
-    chunk_index = 0
-
-    image = bytearray()
-
-    while True:
-        chunk_offset = chunk_index * HIP_RAW_IMG_CHUNK_SIZE
 
-        # Read our color data in 5 byte chunks.
-        # The data contains the color and number of pixels to render which are that color.
-        color_data = hip_contents[chunk_offset:chunk_offset+HIP_RAW_IMG_CHUNK_SIZE]
-
-        # If the color data chunk is empty then we have parsed the full image.
-        if not color_data:
-            break
-
-        assert len(color_data) == HIP_RAW_IMG_CHUNK_SIZE
+    # Our color data is stored in 5 byte chunks.
+    # The data contains the color and number of pixels to render which are that color.
+    if (len(hip_contents) - offset) % HIP_RAW_IMG_CHUNK_SIZE:
+        raise ValueError("Image data length mismatch!")
 
-        # Note that HIP raw image files store there color data in the format BGRA.
-        bgr = color_data[:RAW_RGB_SIZE]
-        a = color_data[RAW_RGB_SIZE:RAW_RGB_SIZE+RAW_A_SIZE]
-        # The last byte of the chunk is the number of pixels that is the given color.
-        num_pixels = color_data[HIP_RAW_IMG_CHUNK_SIZE-1]
+    chunks = np.frombuffer(hip_contents, dtype=np.uint8, offset=offset).reshape(-1, HIP_RAW_IMG_CHUNK_SIZE)
 
-        # Convert our color from BGRA to RGBA.
-        rgba = tuple(bgr[::-1] + a)
+    # Note that HIP raw image files store there color data in the format BGRA.
+    # Convert our colors from BGRA to RGBA.
+    rgba = chunks[:, BGRA_RGBA_SWIZZLE]
+    # The last byte of the chunk is the number of pixels that is the given color.
+    num_pixels = chunks[:, HIP_RAW_IMG_CHUNK_SIZE-1]
 
-        # Extend our data with the number of pixels that are the given color.
-        image += bytearray(rgba * num_pixels)
+    # Validate the decoded size before expanding so a corrupt stream never allocates an oversized buffer.
+    if num_pixels.sum(dtype=np.int64) != total_pixels:
+        raise ValueError("Image data length mismatch!")
 
-        chunk_index += 1
+    # If every chunk describes a single pixel the chunk colors already are the image data.
+    if np.all(num_pixels == 1):
+        image = rgba
 
-    if len(image) // (RAW_RGB_SIZE + RAW_A_SIZE) != total_pixels:
-        raise ValueError("Image data length mismatch!")
+    # Otherwise expand every chunk into `num_pixels` copies of its color in a single pass.
+    else:
+        image = np.repeat(rgba, num_pixels, axis=0)
 
-    return image
+    return bytearray(image)
 
 
 def _load_hip(hip_image):
@@ -257,27 +237,39 @@ def _load_hip(hip_image):
     """
     if isinstance(hip_image, str) and os.path.exists(hip_image):
         with open(hip_image, "rb") as hip_fp:
-            hip_contents = hip_fp.read()
+            # An empty file cannot be memory mapped, so leave it to header parsing to reject it.
+            if not os.fstat(hip_fp.fileno()).st_size:
+                hip_contents = b""
+
+            # Memory map the HIP file rather than reading the whole thing into a bytestring up front.
+            # The mapping keeps its own handle to the file and is released once we are done parsing it.
+            else:
+                hip_contents = mmap.mmap(hip_fp.fileno(), 0, access=mmap.ACCESS_READ)
 
     elif isinstance(hip_image, str) and not os.path.exists(hip_image):
         raise ValueError(f"HIP image {hip_image} does not exist!")
 
-    elif isinstance(hip_image, io.BytesIO):
+    # Any readable binary file object will do, not just `io.BytesIO`.
+    elif hasattr(hip_image, "read"):
         hip_contents = hip_image.read()
 
     else:
         raise TypeError(f"Unsupported HIP image type {hip_image}!")
 
-    num_colors, img_size, coord_size, img_offset, remaining = _parse_header(hip_contents)
+    # Parse through a memoryview so any section of the file we slice out is a zero-copy view.
+    # The parsers otherwise read each section in place at its offset into the file.
+    hip_contents = memoryview(hip_contents)
+
+    num_colors, img_size, coord_size, img_offset, offset = _parse_header(hip_contents)
 
     if num_colors > 0:
-        palette, alpha, remaining = _parse_palette(num_colors, remaining)
-        image = _parse_palette_image_data(img_size, num_colors, remaining)
+        palette, alpha, offset = _parse_palette(num_colors, hip_contents, offset)
+        image = _parse_palette_image_data(img_size, num_colors, hip_contents, offset)
 
     else:
         alpha = bytearray()
         palette = bytearray()
-        image = _parse_raw_image_data(img_size, remaining)
+        image = _parse_raw_image_data(img_size, hip_contents, offset)
 
     return img_size, coord_size, img_offset, image, palette, alpha
 
@@ -286,8 +278,8 @@ def _build_header(image_dimensions, image_type, image_data_size, palette_data_si
     """
     Build a valid HIP file header.
     """
-    palette_header_size = PALETTE_HEADER_SIZE if image_type == PALETTE_IMAGE_TYPE else 0
-    file_size = len(HIP_PREFIX) + HEADER_SIZE + palette_header_size + palette_data_size + image_data_size
+    header_struct = PALETTE_FILE_HEADER_STRUCT if image_type == PALETTE_IMAGE_TYPE else RAW_FILE_HEADER_STRUCT
+    file_size = header_struct.size + palette_data_size + image_data_size
 
     # Not sure what this value is but it seems static.
     unknown_00 = 0x125
@@ -310,17 +302,16 @@ def _build_header(image_dimensions, image_type, image_data_size, palette_data_si
     color_depth = num_colors // BITS_PER_COLOR_CHANNEL
 
     # Fill in our required prefix and meta data.
-    header = HIP_PREFIX
     # TODO: We need to ensure this features the unused/unknown fields from the header we read.
-    header += struct.pack("<IIIIIII", unknown_00, file_size, num_colors, width1, height1, unknown_05, color_depth)
+    fields = (HIP_PREFIX, unknown_00, file_size, num_colors, width1, height1, unknown_05, color_depth)
 
     if image_type == PALETTE_IMAGE_TYPE:
         # The aforementioned palette image sub-header that contains the image dimensions.
         width2, height2 = image_dimensions
         # TODO: We currently pack a bunch of zeros in here but this should be the data we read from the header.
-        header += struct.pack("<IIIIIIII", width2, height2, 0, 0, 0, 0, 0, 0)
+        fields += (width2, height2, 0, 0, 0, 0, 0, 0)
 
-    return header
+    return header_struct.pack(*fields)
 
 
 def _build_palette(palette_data, alpha):
@@ -328,38 +319,42 @@ def _build_palette(palette_data, alpha):
     Build a HIP image palette.
     The data is structured in the format: BGRA.
     """
-    pixel_index = 0
-    hip_palette_data = bytearray()
-    palette_data = palette_data[::-1]
-    alpha = alpha[::-1]
-
-    if len(palette_data) != len(alpha) * (RAW_RGB_SIZE / RAW_A_SIZE):
+    # Validate both channels against the palette size once, up front.
+    if len(palette_data) != HIP_MAX_COLORS * RAW_RGB_SIZE or len(alpha) != HIP_MAX_COLORS * RAW_A_SIZE:
         raise ValueError("Mismatch between RGB and transparency data!")
 
-    while True:
-        bgr_offset = pixel_index * RAW_RGB_SIZE
-        a_offset = pixel_index * RAW_A_SIZE
+    # Reversing the PNG palette data transposes it back into HIP palette order and also turns RGB into BGR.
+    # The reversed arrays are just views, so the reversal and the interleave of the color and transparency
+    # channels into BGRA palette entries happen in the same copy.
+    hip_palette_data = np.empty((HIP_MAX_COLORS, RAW_RGB_SIZE + RAW_A_SIZE), dtype=np.uint8)
+    hip_palette_data[:, :RAW_RGB_SIZE] = np.frombuffer(palette_data, dtype=np.uint8)[::-1].reshape(-1, RAW_RGB_SIZE)
+    hip_palette_data[:, RAW_RGB_SIZE] = np.frombuffer(alpha, dtype=np.uint8)[::-1]
 
-        bgr = palette_data[bgr_offset:bgr_offset+RAW_RGB_SIZE]
-        a = alpha[a_offset:a_offset+RAW_A_SIZE]
+    return hip_palette_data.ravel()
 
-        # If there is no remaining palette data from the source then we are done.
-        if not bgr and not a:
-            break
 
-        # Check to ensure we have not de-synced during the parse process.
-        if bool(bgr) != bool(a):
-            raise ValueError("Mismatch between RGB and transparency data!")
+def _rle_chunks(values):
+    """
+    Split a 1-D array of values into the run length encoded chunks used by HIP image data.
+    The pixel count of a chunk is a single byte so any run longer than MAX_BYTE_VALUE is split up.
+    Return the index of the value that each chunk repeats and the number of pixels in each chunk.
+    """
+    if not values.size:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.uint8)
 
-        hip_palette_data += bgr
-        hip_palette_data += a
+    # Find where each run of identical values starts and how long it is.
+    run_starts = np.concatenate(([0], np.flatnonzero(values[1:] != values[:-1]) + 1))
+    run_lengths = np.diff(np.append(run_starts, values.size))
 
-        pixel_index += 1
+    # Split every run into as many chunks as it takes to fit its length into a byte.
+    # All chunks of a run are full except for the last one, which holds the remainder.
+    chunks_per_run = (run_lengths + MAX_BYTE_VALUE - 1) // MAX_BYTE_VALUE
+    chunk_starts = np.repeat(run_starts, chunks_per_run)
 
-    if len(hip_palette_data) != HIP_MAX_COLORS * (RAW_RGB_SIZE + RAW_A_SIZE):
-        raise ValueError("Mismatch between RGB and transparency data!")
+    num_pixels = np.full(chunk_starts.size, MAX_BYTE_VALUE, dtype=np.uint8)
+    num_pixels[np.cumsum(chunks_per_run) - 1] = run_lengths - MAX_BYTE_VALUE * (chunks_per_run - 1)
 
-    return hip_palette_data
+    return chunk_starts, num_pixels
 
 
 def _build_palette_image(image_data):
@@ -367,23 +362,16 @@ def _build_palette_image(image_data):
     Build HIP palette image data.
     The data is structed as two byte chunks which are: Palette Index, Pixel Count
     """
-    count = 0
-    current_index = -1
     last_index = HIP_MAX_COLORS - 1
-    hip_image_data = bytearray()
-
-    for palette_index in image_data:
-        if (palette_index != current_index and count > 0) or count >= MAX_BYTE_VALUE:
-            hip_image_data += bytearray((last_index - current_index, count))
-            count = 0
+    palette_indices = np.frombuffer(image_data, dtype=np.uint8)
 
-        current_index = palette_index
-        count += 1
+    chunk_starts, num_pixels = _rle_chunks(palette_indices)
 
-    if count:
-        hip_image_data += bytearray((last_index - current_index, count))
+    hip_image_data = np.empty((chunk_starts.size, HIP_PAL_IMG_CHUNK_SIZE), dtype=np.uint8)
+    hip_image_data[:, 0] = last_index - palette_indices[chunk_starts]
+    hip_image_data[:, 1] = num_pixels
 
-    return hip_image_data
+    return hip_image_data.ravel()
 
 
 def _build_raw_image(image_data):
@@ -391,40 +379,22 @@ def _build_raw_image(image_data):
     Build HIP palette image data.
     The data is structed as five byte chunks which are: BGRA (color), Pixel Count
     """
-    count = 0
-    pixel_index = 0
-    current_color = b""
-    hip_image_data = bytearray()
-
-    while True:
-        pixel_offset = pixel_index * (RAW_RGB_SIZE + RAW_A_SIZE)
-        color_data = image_data[pixel_offset:pixel_offset+RAW_RGB_SIZE+RAW_A_SIZE]
-
-        bgr = color_data[:RAW_RGB_SIZE][::-1]
-        a = color_data[RAW_RGB_SIZE:RAW_RGB_SIZE+RAW_A_SIZE]
-
-        # If there is no remaining palette data from the source then we are done.
-        if not bgr and not a:
-            break
-
-        # Check to ensure we have not de-synced during the parse process.
-        if bool(bgr) != bool(a):
-            raise ValueError("Mismatch between RGB and transparency data!")
-
-        color = bgr + a
+    # Check to ensure we have not de-synced during the parse process.
+    if len(image_data) % (RAW_RGB_SIZE + RAW_A_SIZE):
+        raise ValueError("Mismatch between RGB and transparency data!")
 
-        if (color != current_color and count > 0) or count >= MAX_BYTE_VALUE:
-            hip_image_data += bytearray(current_color) + bytearray((count,))
-            count = 0
+    pixels = np.frombuffer(image_data, dtype=np.uint8).reshape(-1, RAW_RGB_SIZE + RAW_A_SIZE)
+    # View each RGBA pixel as a single 32 bit value so whole colors are compared at once.
+    colors = pixels.view(np.uint32).ravel()
 
-        current_color = color
-        pixel_index += 1
-        count += 1
+    chunk_starts, num_pixels = _rle_chunks(colors)
 
-    if count:
-        hip_image_data += bytearray(current_color) + bytearray((count,))
+    hip_image_data = np.empty((chunk_starts.size, HIP_RAW_IMG_CHUNK_SIZE), dtype=np.uint8)
+    # Convert the color of each chunk from RGBA to BGRA.
+    hip_image_data[:, :RAW_RGB_SIZE+RAW_A_SIZE] = pixels[chunk_starts][:, BGRA_RGBA_SWIZZLE]
+    hip_image_data[:, HIP_RAW_IMG_CHUNK_SIZE-1] = num_pixels
 
-    return hip_image_data
+    return hip_image_data.ravel()
 
 
 def _save_hip(image_size, _, __, image, palette, alpha, out):
@@ -435,6 +405,9 @@ def _save_hip(image_size, _, __, image, palette, alpha, out):
     TODO: There is definitely some data we are not writing out to the header.
           See the note at the return statement of _parse_header.
     """
+    # Note that the palette and image builders return flat uint8 arrays. We write those straight to
+    # the output via the buffer protocol rather than copying them into another bytestring first.
+
     # If palette data exists we are saving a palette image.
     if palette and alpha:
         hip_palette_data = _build_palette(palette, alpha)
@@ -466,7 +439,7 @@ def _load_palette_png(image_fp):
     # Get image size.
     size = image_fp.size
     # Get image data.
-    image = bytearray(image_fp.getdata())
+    image = bytearray(image_fp.tobytes())
     # Get color information from the palette.
     palette_data = bytearray(image_fp.getdata().getpalette())
     # Get transparency information from the tRNS header.
@@ -482,13 +455,8 @@ def _load_raw_png(image_fp):
     # Get image size.
     size = image_fp.size
     # Get image data.
-    image_raw = image_fp.getdata()
-
-    image = bytearray()
-
-    # Pillow presents the image data of a raw RGBA PNG image as color tuples.
-    for color_data in image_raw:
-        image += bytearray(color_data)
+    # Pillow can hand us the raw RGBA bytes of the image directly rather than one color tuple per pixel.
+    image = bytearray(image_fp.tobytes())
 
     return size, image
 
@@ -498,7 +466,7 @@ def _load_png(png_image):
     Load a PNG image, determine the image type, and read the data we
     need in order to create other images from this source image.
     """
-    with Image.open(png_image) as image_fp:
+    with input_png(png_image) as png_fp, Image.open(png_fp) as image_fp:
         image_type = image_fp.mode
 
         if image_type == PALETTE_IMAGE_TYPE:
@@ -515,57 +483,43 @@ def _load_png(png_image):
         return size, image, palette_data, alpha
 
 
-def _save_palette_png(image_size, image, palette, alpha, out):
+def _save_palette_png(image_size, image, palette, alpha, out, compress_level):
     """
     Helper to create a PNG palette image from an image size, pixel data, and palette data.
     """
-    with Image.new(PALETTE_IMAGE_TYPE, image_size) as image_fp:
+    # Build the image straight from our contiguous palette index data rather than
+    # having Pillow iterate it pixel by pixel via putdata().
+    with Image.frombuffer(PALETTE_IMAGE_TYPE, image_size, image, "raw", PALETTE_IMAGE_TYPE, 0, 1) as image_fp:
         image_fp.putpalette(palette)
-        image_fp.putdata(image)
         # Setting the transparency kwarg to our alpha raw data creates a tRNS header.
         # The kwarg expects an instance of `bytes()`.
-        image_fp.save(out, format="PNG", transparency=bytes(alpha))
+        image_fp.save(out, format="PNG", transparency=bytes(alpha), compress_level=compress_level)
 
 
-def _save_raw_png(image_size, image_data, out):
+def _save_raw_png(image_size, image_data, out, compress_level):
     """
     Helper to create a raw RGBA PNG image from an image size and pixel data.
     """
-    image = []
-    pixel_index = 0
-
-    # Pillow expects raw RGBA image data as an iterable of RGBA tuples.
-    while True:
-        pixel_offset = pixel_index * (RAW_RGB_SIZE + RAW_A_SIZE)
-
-        rgba = image_data[pixel_offset:pixel_offset+RAW_RGB_SIZE+RAW_A_SIZE]
-
-        # If there is no remaining palette data from the source then we are done.
-        if not rgba:
-            break
-
-        assert len(rgba) == (RAW_RGB_SIZE + RAW_A_SIZE)
-
-        image.append(tuple(rgba))
-        pixel_index += 1
+    if len(image_data) != image_size[0] * image_size[1] * (RAW_RGB_SIZE + RAW_A_SIZE):
+        raise ValueError("Image data length mismatch!")
 
-    with Image.new(RAW_IMAGE_TYPE, image_size) as image_fp:
-        image_fp.putdata(image)
-        image_fp.save(out, format="PNG")
+    # Our image data is already contiguous RGBA bytes, which Pillow can use directly.
+    with Image.frombuffer(RAW_IMAGE_TYPE, image_size, image_data, "raw", RAW_IMAGE_TYPE, 0, 1) as image_fp:
+        image_fp.save(out, format="PNG", compress_level=compress_level)
 
 
-def _save_png(image_size, image, palette, alpha, out):
+def _save_png(image_size, image, palette, alpha, out, compress_level):
     """
     Save a PNG from the given image and palette data.
     Note that we create different image types based on the presence of palette data.
     """
     # If palette data exists we are saving a palette image.
     if palette and alpha:
-        _save_palette_png(image_size, image, palette, alpha, out)
+        _save_palette_png(image_size, image, palette, alpha, out, compress_level)
 
     # Otherwise we are working with a raw RGBA image.
     elif not palette and not alpha:
-        _save_raw_png(image_size, image, out)
+        _save_raw_png(image_size, image, out, compress_level)
 
     else:
         raise TypeError("Unsupported image type!")
@@ -582,14 +536,13 @@ def _open_png(image, image_size, palette, alpha):
     is_palette = bool(palette) and bool(alpha)
     image_type = PALETTE_IMAGE_TYPE if is_palette else RAW_IMAGE_TYPE
 
-    with Image.new(image_type, image_size) as image_fp:
+    # Build the image straight from the contiguous pixel data rather than having Pillow iterate it via putdata().
+    with Image.frombuffer(image_type, image_size, image, "raw", image_type, 0, 1) as image_fp:
         if is_palette:
             image_fp.putpalette(palette)
             image_fp.info["transparency"] = bytes(alpha)  # The transparency must be an instance of `bytes()`.
 
-    image_fp.putdata(image)
-
-    yield image_fp
+        yield image_fp
 
 
 @contextlib.contextmanager
@@ -600,7 +553,13 @@ def _chunk_canvas(image_size, palette, alpha):
     for palette images as the "transparent" color.
     """
     num_pixels = image_size[0] * image_size[1]
-    image = b"\xFF" * num_pixels
+
+    if palette and alpha:
+        image = b"\xFF" * num_pixels
+
+    # Raw images have no palette so we fill them with pixels that are fully transparent instead.
+    else:
+        image = b"\xFF\x00\x00\x00" * num_pixels
 
     with _open_png(image, image_size, palette, alpha) as image_fp:
         yield image_fp
@@ -644,14 +603,15 @@ class HIPImage:
         """
         self.image_size, self.image, self.palette, self.alpha = _load_png(png_input)
 
-    def save_png(self, png_output):
+    def save_png(self, png_output, compress_level=PNG_DEFAULT_COMPRESS_LEVEL):
         """
         Save a previously loaded image as a PNG image.
+        The zlib compression level can be lowered to trade file size for encode speed.
         """
         if not self.image:
             raise ValueError("No image has been loaded!")
 
-        _save_png(self.image_size, self.image, self.palette, self.alpha, png_output)
+        _save_png(self.image_size, self.image, self.palette, self.alpha, png_output, compress_level)
 
     def get_chunk(self, src_x, src_y, src_width, src_height, x, y, layer, **_):
         """
@@ -661,7 +621,10 @@ class HIPImage:
         """
         chunk_png = io.BytesIO()
 
-        with _chunk_canvas(self.coord_size, self.palette, self.alpha) as chunk_canvas:
+        # Raw images do not describe a coordinate space of their own, so the image itself is the canvas.
+        canvas_size = self.image_size if self.coord_size == (0, 0) else self.coord_size
+
+        with _chunk_canvas(canvas_size, self.palette, self.alpha) as chunk_canvas:
             with _open_png(self.image, self.image_size, self.palette, self.alpha) as src_png:
                 chunk_canvas.paste(src_png, box=self.offset)
 
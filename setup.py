@@ -8,5 +8,5 @@ setup(
     url="https://github.com/slacknate/libhip",
     description="A library for extracting HIP file images.",
     packages=find_packages(include=["libhip", "libhip.*"]),
-    install_requires=["Pillow==8.2.0"]
+    install_requires=["numpy>=1.20", "Pillow==8.2.0"]
 )
@@ -1,8 +1,15 @@
+import io
 import os
+import struct
+import shutil
 import unittest
 import contextlib
+from unittest import mock
 
-from libhip.hip import HIPImage
+from PIL import Image
+
+from libhip import __main__ as cli
+from libhip.hip import HIPImage, _build_palette_image, _parse_palette_image_data, _parse_raw_image_data
 
 TEST_DIRECTORY = os.path.abspath(os.path.dirname(__file__))
 
@@ -40,6 +47,35 @@ REF_RAW_PNG = os.path.join(TEST_DIRECTORY, "ref_raw.png")
 REF_RAW_PNG_DATA = read_file(REF_RAW_PNG)
 
 
+def round_trip_png(mode, image_data, palette=None, transparency=None):
+    """
+    Build a single row PNG from the given pixel data, convert it to a HIP image and load that back.
+    Return the image loaded from the PNG and the image loaded from the HIP data.
+    """
+    # Every mode we support stores one byte per channel.
+    image_size = (len(image_data) // len(mode), 1)
+
+    src_png = io.BytesIO()
+    with Image.frombuffer(mode, image_size, image_data, "raw", mode, 0, 1) as src_image:
+        if palette is not None:
+            src_image.putpalette(palette)
+
+        save_kwargs = {} if transparency is None else {"transparency": transparency}
+        src_image.save(src_png, format="PNG", **save_kwargs)
+    src_png.seek(0)
+
+    image = HIPImage()
+    image.load_png(src_png)
+    hip_data = io.BytesIO()
+    image.save_hip(hip_data)
+    hip_data.seek(0)
+
+    round_trip = HIPImage()
+    round_trip.load_hip(hip_data)
+
+    return image, round_trip
+
+
 class HIPImageTests(unittest.TestCase):
     def test_hip_to_png_palette(self):
         with test_file("hip_to_png_pal.png") as hip_to_png_pal:
@@ -72,3 +108,204 @@ class HIPImageTests(unittest.TestCase):
             image.save_hip(png_raw_to_hip)
             png_raw_to_hip_data = read_file(png_raw_to_hip)
             self.assertEqual(png_raw_to_hip_data, REF_RAW_HIP_DATA)
+
+    def test_file_objects(self):
+        with test_file("file_objects.hip") as file_objects_hip:
+            image = HIPImage()
+
+            with open(SRC_RAW_PNG, "rb") as png_fp:
+                image.load_png(png_fp)
+
+            with open(file_objects_hip, "wb") as hip_fp:
+                image.save_hip(hip_fp)
+
+            self.assertEqual(read_file(file_objects_hip), REF_RAW_HIP_DATA)
+
+            round_trip = HIPImage()
+
+            with open(file_objects_hip, "rb") as hip_fp:
+                round_trip.load_hip(hip_fp)
+
+            self.assertEqual(bytes(round_trip.image), bytes(image.image))
+
+    def test_palette_long_runs_round_trip(self):
+        # Runs longer than 255 pixels must be split across multiple chunks.
+        image_data = b"\x01" * 255 + b"\x02" * 256 + b"\x03" * 600 + b"\x04" + b"\x05" * 2
+        image, round_trip = round_trip_png("P", image_data, bytes(range(256)) * 3, bytes(range(256)))
+
+        self.assertEqual(round_trip.image_size, (len(image_data), 1))
+        self.assertEqual(bytes(round_trip.image), image_data)
+        self.assertEqual(bytes(round_trip.palette), bytes(image.palette))
+        self.assertEqual(bytes(round_trip.alpha), bytes(image.alpha))
+
+    def test_build_palette_image_long_run(self):
+        # A 600 pixel run is two full chunks of 255 pixels and a final chunk with the remaining 90.
+        # Palette indices are stored inverted, so index 1 is written as 0xFE.
+        self.assertEqual(bytes(_build_palette_image(b"\x01" * 600)), bytes.fromhex("feff feff fe5a"))
+
+    def test_raw_long_runs_round_trip(self):
+        # Runs longer than 255 pixels must be split across multiple chunks.
+        image_data = b"\x01\x02\x03\xFF" * 255 + b"\x03\x02\x01\x80" * 300 + b"\x00\x00\x00\x00" * 2
+        _, round_trip = round_trip_png("RGBA", image_data)
+
+        self.assertEqual(round_trip.image_size, (len(image_data) // 4, 1))
+        self.assertEqual(bytes(round_trip.image), image_data)
+
+    def test_palette_single_pixel_runs_round_trip(self):
+        # Every pixel differs from its neighbour so every chunk is a run of one.
+        # This only checks the round trip is lossless, the decoder paths are checked directly below.
+        image_data = b"\x01\x02\x03"
+        _, round_trip = round_trip_png("P", image_data, bytes(range(256)) * 3, bytes(range(256)))
+
+        self.assertEqual(round_trip.image_size, (len(image_data), 1))
+        self.assertEqual(bytes(round_trip.image), image_data)
+
+    def test_raw_single_pixel_runs_round_trip(self):
+        # Every pixel differs from its neighbour so every chunk is a run of one.
+        # This only checks the round trip is lossless, the decoder paths are checked directly below.
+        image_data = b"\x01\x02\x03\xFF" + b"\x03\x02\x01\x80" + b"\x00\x00\x00\x00"
+        _, round_trip = round_trip_png("RGBA", image_data)
+
+        self.assertEqual(round_trip.image_size, (len(image_data) // 4, 1))
+        self.assertEqual(bytes(round_trip.image), image_data)
+
+    def test_parse_palette_image_data_single_pixel_runs(self):
+        # Palette indices are stored inverted, so 0xFE, 0xFD and 0xFC are indices 1, 2 and 3.
+        single_runs = bytes.fromhex("fe01 fd01 fc01")
+        self.assertEqual(_parse_palette_image_data((3, 1), 256, single_runs, 0), b"\x01\x02\x03")
+
+        # A chunk with no pixels must be dropped rather than treated as one more single pixel run.
+        zero_run = bytes.fromhex("fe01 0000 fd01 fc01")
+        self.assertEqual(_parse_palette_image_data((3, 1), 256, zero_run, 0), b"\x01\x02\x03")
+
+    def test_parse_raw_image_data_single_pixel_runs(self):
+        # Chunks store their color as BGRA followed by the pixel count.
+        single_runs = bytes.fromhex("030201ff01 0102038001")
+        self.assertEqual(_parse_raw_image_data((2, 1), single_runs, 0), bytes.fromhex("010203ff 03020180"))
+
+        # A chunk with no pixels must be dropped rather than treated as one more single pixel run.
+        zero_run = bytes.fromhex("030201ff01 0a0b0c0d00 0102038001")
+        self.assertEqual(_parse_raw_image_data((2, 1), zero_run, 0), bytes.fromhex("010203ff 03020180"))
+
+    def test_get_chunk_palette(self):
+        image = HIPImage()
+        image.load_hip(SRC_PAL_HIP)
+
+        (x_offset, y_offset), (width, height) = image.offset, image.image_size
+        location, layer, chunk_png = image.get_chunk(x_offset, y_offset, width, height, 1, 2, 3)
+        self.assertEqual(location, (1, 2))
+        self.assertEqual(layer, 3)
+
+        # A chunk covering exactly the area the image is pasted at is the image itself.
+        with Image.open(chunk_png) as chunk_image:
+            self.assertEqual(chunk_image.size, image.image_size)
+            self.assertEqual(chunk_image.tobytes(), bytes(image.image))
+
+    def test_get_chunk_raw(self):
+        image = HIPImage()
+        image.load_hip(SRC_RAW_HIP)
+
+        _, _, chunk_png = image.get_chunk(8, 4, 16, 16, 0, 0, 0)
+
+        # Raw images have no coordinate space so the chunk is a crop of the image itself.
+        with Image.frombuffer("RGBA", image.image_size, bytes(image.image), "raw", "RGBA", 0, 1) as src_image:
+            src_crop = src_image.crop((8, 4, 24, 20)).tobytes()
+
+        with Image.open(chunk_png) as chunk_image:
+            self.assertEqual(chunk_image.size, (16, 16))
+            self.assertEqual(chunk_image.tobytes(), src_crop)
+            # Make sure we are not just comparing two fully transparent images.
+            self.assertTrue(any(chunk_image.tobytes()))
+
+    def test_palette_index_out_of_range(self):
+        # The header num_colors field is at byte offset 12; palette indices must stay within 256 entries.
+        hip_data = bytearray(read_file(SRC_PAL_HIP))
+        struct.pack_into("<I", hip_data, 12, 300)
+
+        image = HIPImage()
+        with self.assertRaisesRegex(ValueError, "Palette index out of range"):
+            image.load_hip(io.BytesIO(hip_data))
+
+    def test_truncated_palette(self):
+        # Cut the file halfway through the 1024 byte palette, keeping the header file size consistent.
+        hip_data = bytearray(read_file(SRC_PAL_HIP)[:64 + 512])
+        struct.pack_into("<I", hip_data, 8, len(hip_data))
+
+        image = HIPImage()
+        with self.assertRaisesRegex(ValueError, "Palette data length mismatch"):
+            image.load_hip(io.BytesIO(hip_data))
+
+    def test_empty_file(self):
+        with test_file("empty.hip") as empty_hip:
+            open(empty_hip, "wb").close()
+
+            image = HIPImage()
+            with self.assertRaisesRegex(ValueError, "Missing HIP file header prefix"):
+                image.load_hip(empty_hip)
+
+
+class CLITests(unittest.TestCase):
+    def assertPNGMatches(self, png_path, ref_png_path):
+        # The command line saves with a fast compression level so compare decoded pixels rather than file bytes.
+        with Image.open(png_path) as png_image, Image.open(ref_png_path) as ref_image:
+            self.assertEqual(png_image.mode, ref_image.mode)
+            self.assertEqual(png_image.size, ref_image.size)
+            self.assertEqual(png_image.getpalette(), ref_image.getpalette())
+            self.assertEqual(png_image.tobytes(), ref_image.tobytes())
+
+    def test_topng_multiple_paths(self):
+        with contextlib.ExitStack() as stack:
+            pal_hip = stack.enter_context(test_file("cli_pal.hip"))
+            raw_hip = stack.enter_context(test_file("cli_raw.hip"))
+            shutil.copyfile(SRC_PAL_HIP, pal_hip)
+            shutil.copyfile(SRC_RAW_HIP, raw_hip)
+
+            pal_png = stack.enter_context(test_file("cli_pal.png"))
+            raw_png = stack.enter_context(test_file("cli_raw.png"))
+
+            with mock.patch("sys.argv", ["hip", "topng", pal_hip, raw_hip]):
+                cli.main()
+
+            self.assertPNGMatches(pal_png, REF_PAL_PNG)
+            self.assertPNGMatches(raw_png, REF_RAW_PNG)
+
+    def test_topng_single_path(self):
+        with contextlib.ExitStack() as stack:
+            pal_hip = stack.enter_context(test_file("cli_pal.hip"))
+            shutil.copyfile(SRC_PAL_HIP, pal_hip)
+
+            pal_png = stack.enter_context(test_file("cli_pal.png"))
+
+            # A single path is converted in process without starting a process pool.
+            with mock.patch("sys.argv", ["hip", "topng", pal_hip]), \
+                    mock.patch("concurrent.futures.ProcessPoolExecutor", side_effect=AssertionError):
+                cli.main()
+
+            self.assertPNGMatches(pal_png, REF_PAL_PNG)
+
+    def assertExitsWithUsageError(self, argv):
+        with mock.patch("sys.argv", ["hip"] + argv), contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit) as exit_context:
+                cli.main()
+
+        self.assertEqual(exit_context.exception.code, 2)
+
+    def test_missing_command(self):
+        self.assertExitsWithUsageError([])
+
+    def test_missing_input_path(self):
+        self.assertExitsWithUsageError(["topng", os.path.join(TEST_DIRECTORY, "does_not_exist.hip")])
+
+    def test_unknown_flag(self):
+        self.assertExitsWithUsageError(["topng", "--unknown", SRC_PAL_HIP])
+
+
+class PackageTests(unittest.TestCase):
+    def test_public_api(self):
+        import libhip
+
+        self.assertIn("HIPImage", dir(libhip))
+
+        namespace = {}
+        exec("from libhip import *", namespace)
+        self.assertIs(namespace["HIPImage"], HIPImage)